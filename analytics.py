@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+# ==============================================================================
+# SCORE ANALYTICS
+# Cohort statistics over each user's latest row, kept as integer histograms.
+# A ResponseIndex listener: every index change arrives as the score rows it
+# removed and added, so new sheet rows update the counts without a rescan.
+# Percentiles, means and per-user percentile ranks are read off the
+# histograms, which is exact because scores are integers.
+# ==============================================================================
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+class ScoreAnalytics:
+    def __init__(self, fields, num_roles):
+        self.fields = list(fields)
+        self.num_roles = num_roles
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.users = 0
+            self.histograms = {field: np.zeros(self.num_roles if field == 'k_band' else 1, dtype=np.int64) for field in self.fields}
+            self._summary = None
+
+    def __getstate__(self):
+        # Picklable for batch.py worker processes
+        state = self.__dict__.copy(); del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def apply(self, removed, added):
+        # removed/added: (n, len(fields)) integer arrays of users' latest scores
+        with self._lock:
+            for rows, sign in ((removed, -1), (added, 1)):
+                if len(rows) == 0: continue
+                self.users += sign * len(rows)
+                for col, field in enumerate(self.fields):
+                    counts = np.bincount(rows[:, col].astype(np.intp), minlength=len(self.histograms[field]))
+                    if len(counts) > len(self.histograms[field]):
+                        grown = np.zeros(len(counts), dtype=np.int64); grown[:len(self.histograms[field])] = self.histograms[field]
+                        self.histograms[field] = grown
+                    self.histograms[field][:len(counts)] += sign * counts
+            self._summary = None
+
+    def percentile_ranks(self, scores):
+        # scores: {field: value} -> {field: % of users scoring lower, counting ties as half}
+        with self._lock:
+            ranks = {}
+            for field, value in scores.items():
+                counts = self.histograms[field]
+                total = counts.sum()
+                if not total: ranks[field] = None; continue
+                below = counts[:min(value, len(counts))].sum()
+                equal = counts[value] if value < len(counts) else 0
+                ranks[field] = round(float(100.0 * (below + 0.5 * equal) / total), 1)
+            return ranks
+
+    def summary(self, role_names):
+        # (JSON document, fingerprint); rebuilt only after the counts changed
+        with self._lock:
+            if self._summary is None:
+                doc = {"users": int(self.users), "roles": {}, "scores": {}}
+                for field in self.fields:
+                    counts = self.histograms[field]
+                    total = int(counts.sum())
+                    if field == 'k_band':
+                        doc["roles"] = {name: {"k_band": k, "users": int(counts[k]), "share": round(counts[k] / total, 4) if total else None}
+                                        for k, name in enumerate(role_names)}
+                        continue
+                    values = np.arange(len(counts))
+                    cumulative = np.cumsum(counts)
+                    doc["scores"][field] = {
+                        "histogram": {"bins": values.tolist(), "counts": counts.tolist()},
+                        "mean": round(float((values * counts).sum() / total), 3) if total else None,
+                        "percentiles": {f"p{q}": int(np.searchsorted(cumulative, q / 100 * total)) if total else None for q in PERCENTILES},
+                    }
+                body = json.dumps(doc, separators=(',', ':'))
+                self._summary = (body, hashlib.sha256(body.encode('utf-8')).hexdigest()[:16])
+            return self._summary
+
+    def fingerprint(self, role_names):
+        return self.summary(role_names)[1]
@@ -1,28 +1,43 @@
-from flask import Flask, request, render_template_string, jsonify
-import pandas as pd
-import numpy as np
+from flask import Flask, Response, request, render_template, jsonify, abort, g
 import plotly.graph_objects as go
+import hmac
+import json
 import os
-import requests
+import time
+from plotly.offline import get_plotlyjs_version
+from analytics import ScoreAnalytics
+from assets import AssetBundle, content_hash
+from geometry import build_scene
+from http_cache import CompressedBody, PageCache, cacheable_response
+from metrics import CACHE_REQUESTS, REGISTRY, REQUEST_SECONDS, UPSTREAM_ERRORS, Gauge, timed
+from response_index import SCORE_FIELDS, ResponseIndex, normalize_column
+from response_store import ResponseStore
+from sheetdb_client import SheetDBClient
 
 # --- Configuration ---
 USE_MOCK_DATA = False 
-SHEETDB_URL = "https://sheetdb.io/api/v1/7fida3dgawvel"
+SHEETDB_URL = os.environ.get("SHEETDB_URL", "https://sheetdb.io/api/v1/7fida3dgawvel")
+SHEETDB_TIMEOUT = float(os.environ.get("SHEETDB_TIMEOUT", 15)) # read timeout per upstream attempt, seconds
+SHEETDB_RETRIES = int(os.environ.get("SHEETDB_RETRIES", 2))
+SHEETDB_MAX_CONCURRENCY = int(os.environ.get("SHEETDB_MAX_CONCURRENCY", 4)) # upstream calls in flight per worker
+SHEET_SEARCH_ON_MISS = os.environ.get("SHEET_SEARCH_ON_MISS", "1") == "1" # look unknown user_ids up server-side before the next refresh
+SHEET_SEARCH_TIMEOUT = float(os.environ.get("SHEET_SEARCH_TIMEOUT", 2)) # read timeout of that lookup, which runs inside the request and is never retried
+SHEET_SEARCH_RATE = float(os.environ.get("SHEET_SEARCH_RATE", 1)) # such lookups per second per worker, in bursts of up to 5; the rest are answered 404
+SHEET_CACHE_TTL = int(os.environ.get("SHEET_CACHE_TTL", 300)) # seconds before a background refresh is started
+SHEET_SNAPSHOT_PATH = os.environ.get("SHEET_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "sheet-snapshot.json")) # shared by the workers; its directory is created private (0700)
+CACHE_INVALIDATE_TOKEN = os.environ.get("CACHE_INVALIDATE_TOKEN") # required by /cache/invalidate, which is disabled while unset
+SHELL_MAX_AGE = int(os.environ.get("SHELL_MAX_AGE", 300)) # browser/CDN cache lifetime of the /dashboard shell; assets are immutable
+DASHBOARD_CACHE_CONTROL = os.environ.get("DASHBOARD_CACHE_CONTROL", "public, no-cache") # dashboards and the user API: revalidate via ETag
+PAGE_CACHE_SIZE = int(os.environ.get("PAGE_CACHE_SIZE", 256)) # rendered dashboards kept in memory, per worker
+SPHERE_RESOLUTION = tuple(int(n) for n in os.environ.get("SPHERE_RESOLUTION", "40x20").split("x")) # sphere mesh points around x pole-to-pole
 
 app = Flask(__name__)
 
 # ==============================================================================
 # 1. PRESENTATION LAYER (HTML TEMPLATE - with icon and JS fixes)
 # ==============================================================================
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Your Archetype Dashboard</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com"><link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        :root { --accent-color: {{ role_info.color }}; }
+# Shared between the server-rendered page and the client-rendered shell
+DASHBOARD_CSS = """
         body{font-family:'Inter',sans-serif;background-color:#fff;color:#4a5568;margin:0;padding:24px;box-sizing: border-box;}
         
         .dashboard-grid{ display: grid; grid-template-columns: 1fr 2fr; gap: 24px; width: 100%; max-width: 1600px; margin: 0 auto; }
@@ -68,14 +83,8 @@ HTML_TEMPLATE = """
         .validate-button { display: inline-block; background-color: #007bff; color: #fff; padding: 12px 24px; font-size: 0.9rem; font-weight: 600; text-decoration: none; border-radius: 8px; transition: background-color 0.2s ease; margin-top: 10px; }
         .validate-button:hover { background-color: #0056b3; }
         @media (max-width: 768px) { .dashboard-grid { grid-template-columns: 1fr; } }
-    </style>
-</head>
-<body>
-    <div class="dashboard-grid">
-        <div class="left-column">
-            <div class="card archetype-card"><h2>{{ role }}</h2><p>{{ role_info.title }}</p><p style="font-size:0.9rem; font-weight:400; color:#718096; margin-top:12px;">User ID: {{ user_id }}</p></div>
-            <div class="pupil-warning" id="pupil-warning-message" style="display: {% if k_band == 0 %}block{% else %}none{% endif %};"><strong>Warning:</strong> There is a threat in the environment. All players must do exactly as instructed. Stay with the group.</div>
-            <div class="kpi-grid"><div class="card kpi-card"><div class="value">{{ f_score }}</div><div class="label">Freedom</div></div><div class="card kpi-card"><div class="value">{{ s_score }}</div><div class="label">Security</div></div><div class="card kpi-card"><div class="value">{{ r_score }}</div><div class="label">Responsibility</div></div></div>
+"""
+METRIC_CARDS_HTML = """
             <div class="card">
                 <h3 class="card-header">
                     <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="currentColor" stroke="none">
@@ -93,14 +102,35 @@ HTML_TEMPLATE = """
                 </h3>
                 {% for metric in display_metrics[3:] %}<div class="metric-slider"><div class="metric-name">{{ metric.metric }}</div><div class="track-container"><span class="label">{{ metric.start_label }}</span><div class="track"><div class="dot" id="dot-{{ metric.metric.lower() }}" style="left: calc({{ k_band }} / 5 * 100% - 7.5px);"></div></div><span class="label">{{ metric.end_label }}</span></div></div>{% endfor %}
             </div>
-            <div class="card"><h3 class="card-header">At a Glance</h3><div class="traits-list"><ul>{% for trait in role_info.traits %}<li>{{ trait }}</li>{% endfor %}</ul></div><div class="qa-list">{% for item in role_info.q_and_a %}<h4>{{ item.q }}</h4><p>{{ item.a }}</p>{% endfor %}</div></div>
+"""
+VALIDATION_CARD_HTML = """
             <div class="card validation-card">
                 <h3>Validate your result: one token, one signal</h3><p>For 1 euro, you validate yourself and everyone who has not yet. Each validation adds your data to a growing dataset, sending a clear signal: it is safe and wise to differentiate beyond “Pupil.” With validation, you also receive the full SI Paper.</p>
                 <h3>What the Paper reveals</h3><ul><li>The reality beyond standardised education.</li><li>A new language for growth.</li><li>Why some thrive as Founders while others flourish as Scholars.</li><li>How the five games are designed and why they feel different.</li><li>Why Responsibility matters most.</li><li>Proof: 10 years of practice, thousands of reflections.</li></ul>
                 <h3>Privacy</h3><p>Your results are stored anonymously. Only validated results can send a clear signal for change.</p>
                 <a href="https://thequantumfamily.com/store" class="validate-button" target="_top">Validate results &amp; receive the paper →</a>
             </div>
-        </div>
+"""
+
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Your Archetype Dashboard</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com"><link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
+    <style>
+        :root { --accent-color: {{ role_info.color }}; }
+"""+DASHBOARD_CSS+"""    </style>
+</head>
+<body>
+    <div class="dashboard-grid">
+        <div class="left-column">
+            <div class="card archetype-card"><h2>{{ role }}</h2><p>{{ role_info.title }}</p><p style="font-size:0.9rem; font-weight:400; color:#718096; margin-top:12px;">User ID: {{ user_id }}</p></div>
+            <div class="pupil-warning" id="pupil-warning-message" style="display: {% if k_band == 0 %}block{% else %}none{% endif %};"><strong>Warning:</strong> There is a threat in the environment. All players must do exactly as instructed. Stay with the group.</div>
+            <div class="kpi-grid"><div class="card kpi-card"><div class="value">{{ f_score }}</div><div class="label">Freedom</div></div><div class="card kpi-card"><div class="value">{{ s_score }}</div><div class="label">Security</div></div><div class="card kpi-card"><div class="value">{{ r_score }}</div><div class="label">Responsibility</div></div></div>
+"""+METRIC_CARDS_HTML+"""            <div class="card"><h3 class="card-header">At a Glance</h3><div class="traits-list"><ul>{% for trait in role_info.traits %}<li>{{ trait }}</li>{% endfor %}</ul></div><div class="qa-list">{% for item in role_info.q_and_a %}<h4>{{ item.q }}</h4><p>{{ item.a }}</p>{% endfor %}</div></div>
+"""+VALIDATION_CARD_HTML+"""        </div>
         <div class="right-column">
             <div class="card graph-card">
                 {{graph_html|safe}}
@@ -146,6 +176,103 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Client-rendered dashboard: a static shell, identical for every user, that
+# fills itself from /api/user/<user_id> and the hashed scene bundle.
+SHELL_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Your Archetype Dashboard</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com"><link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
+    <link href="{{ css_url }}" rel="stylesheet">
+    <script charset="utf-8" src="{{ plotlyjs_url }}"></script>
+    <script defer src="{{ js_url }}"></script>
+</head>
+<body>
+    <p id="dashboard-error" style="color:red; display:none;"></p>
+    <div class="dashboard-grid" id="dashboard" data-scene="{{ scene_url }}" data-api="{{ api_url }}" style="display:none;">
+        <div class="left-column">
+            <div class="card archetype-card"><h2 id="role-name"></h2><p id="role-title"></p><p style="font-size:0.9rem; font-weight:400; color:#718096; margin-top:12px;">User ID: <span id="user-id"></span></p></div>
+            <div class="pupil-warning" id="pupil-warning-message" style="display: none;"><strong>Warning:</strong> There is a threat in the environment. All players must do exactly as instructed. Stay with the group.</div>
+            <div class="kpi-grid"><div class="card kpi-card"><div class="value" id="score-freedom"></div><div class="label">Freedom</div></div><div class="card kpi-card"><div class="value" id="score-security"></div><div class="label">Security</div></div><div class="card kpi-card"><div class="value" id="score-responsibility"></div><div class="label">Responsibility</div></div></div>
+"""+METRIC_CARDS_HTML+"""            <div class="card"><h3 class="card-header">At a Glance</h3><div class="traits-list"><ul id="traits-list"></ul></div><div class="qa-list" id="qa-list"></div></div>
+"""+VALIDATION_CARD_HTML+"""        </div>
+        <div class="right-column">
+            <div class="card graph-card">
+                <div id="plotly-graph" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+                <div id="growth-text-display"></div>
+            </div>
+            <div class="card slider-control-card"><h3 class="card-header" id="slider-title"></h3><div class="html-slider-container"><input type="range" min="0" max="5" value="0" id="archetype-slider"><div class="slider-labels">{% for d in cube_definitions %}<span>{{ d.label }}</span>{% endfor %}</div></div></div>
+            <div class="card">
+                <h3 class="card-header">Your Journey</h3>
+                <div class="journey-section"><h4>Start</h4><p id="journey-start"></p><h4>Play</h4><p id="journey-play"></p><h4>Quest</h4><p id="journey-quest"></p><h4>Legacy</h4><p id="journey-legacy"></p></div>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+DASHBOARD_JS = """
+(function() {
+    const dashboard = document.getElementById('dashboard');
+    const errorMessage = document.getElementById('dashboard-error');
+    const userId = new URLSearchParams(window.location.search).get('user_id');
+    function showError(message) { errorMessage.innerText = message; errorMessage.style.display = 'block'; }
+    function setText(id, text) { document.getElementById(id).innerText = text; }
+    if (!userId) { showError('No user_id provided.'); return; }
+
+    function selectRole(scene, kValue, graphDiv) {
+        const stepInfo = scene.steps[kValue];
+        if (graphDiv) Plotly.update(graphDiv, { visible: stepInfo.args[0].visible }, { 'title.text': stepInfo.args[1]['title.text'] });
+        setText('slider-title', 'Role: ' + stepInfo.label);
+        setText('growth-text-display', scene.growth_texts[kValue]);
+        document.getElementById('pupil-warning-message').style.display = kValue === 0 ? 'block' : 'none';
+        const newPosition = `calc(${kValue} / 5 * 100% - 7.5px)`;
+        scene.metrics.forEach(metric => {
+            const dot = document.getElementById(`dot-${metric.toLowerCase()}`);
+            if (dot) dot.style.left = newPosition;
+        });
+    }
+
+    function render(scene, user) {
+        const roleInfo = scene.roles[user.role];
+        document.documentElement.style.setProperty('--accent-color', roleInfo.color);
+        setText('role-name', user.role); setText('role-title', roleInfo.title); setText('user-id', user.user_id);
+        setText('score-freedom', user.scores.freedom); setText('score-security', user.scores.security); setText('score-responsibility', user.scores.responsibility);
+        const traits = document.getElementById('traits-list');
+        roleInfo.traits.forEach(trait => { const li = document.createElement('li'); li.innerText = trait; traits.appendChild(li); });
+        const qaList = document.getElementById('qa-list');
+        roleInfo.q_and_a.forEach(item => {
+            const q = document.createElement('h4'); q.innerText = item.q; qaList.appendChild(q);
+            const a = document.createElement('p'); a.innerText = item.a; qaList.appendChild(a);
+        });
+        ['start', 'play', 'quest', 'legacy'].forEach(part => setText('journey-' + part, roleInfo[part + '_text']));
+        dashboard.style.display = '';
+
+        // Show the user's role before the first draw, then let the slider toggle traces
+        const step = scene.steps[user.k_band];
+        scene.figure.data.forEach((trace, i) => { trace.visible = step.args[0].visible[i]; });
+        scene.figure.layout.title.text = step.args[1]['title.text'];
+        const graphDiv = document.getElementById('plotly-graph');
+        Plotly.newPlot(graphDiv, scene.figure.data, scene.figure.layout, scene.config);
+        const archetypeSlider = document.getElementById('archetype-slider');
+        archetypeSlider.value = user.k_band;
+        selectRole(scene, user.k_band, null);
+        archetypeSlider.addEventListener('input', event => selectRole(scene, parseInt(event.target.value, 10), graphDiv));
+    }
+
+    Promise.all([
+        fetch(dashboard.dataset.scene).then(response => response.json()),
+        fetch(dashboard.dataset.api + encodeURIComponent(userId)).then(response => response.json())
+    ]).then(([scene, user]) => {
+        if (user.error) { showError(user.error); return; }
+        render(scene, user);
+    }).catch(error => showError('An error occurred: ' + error));
+})();
+"""
+
 # ==============================================================================
 # 2. DATA & CONFIGURATION
 # ==============================================================================
@@ -157,72 +284,33 @@ role_details = {
     "Founder": { "game_name": "Neotraditional Game", "color": "#f4a261", "title": "A Visionary Leader", "growth_text": "This is the space a founder needs to grow.", "start_text": "You are matched with the Founder, a potential Visionary Leader who creates what has never existed before. Your gift is to see possibilities where others see risk, turning ideas into opportunities that shape the future. You thrive in the Neotraditional Game, where freedom and uncertainty open new paths to growth and discovery.", "play_text": "The Neotraditional Game fits you because it gives you ownership and the freedom to take calculated risks. It provides open space, autonomy, and the chance to act before certainty exists. You prefer the unknown, where opportunities can emerge.", "quest_text": "You ask and resolve “What if?”, “How can I?”, “Can I?”, and “What’s this?” questions, exploring potential from every angle. You find fulfilment when your vision becomes real and others begin to follow it. Your curiosity generates opportunity and gives others new space to grow.", "legacy_text": "You are trusted to imagine boldly, act decisively, and build ventures that change the game. Founders are the architects of the future, expanding economies and creating markets. They shape the future through courage and creation.", "traits": ["Chases ideas", "Breaks rules", "Dislikes limits", "Takes risks", "Sees future"], "q_and_a": [ {"q": "What excites you?", "a": "Chasing big ideas and trying new things."}, {"q": "What matters?", "a": "Freedom to experiment and take risks."}, {"q": "A great day looks like…", "a": "A spark hits: you sketch, test, and tinker until your idea begins to take shape."}, {"q": "What you don’t like…", "a": "Being stuck in rules that stop you from exploring."}, {"q": "Secret power", "a": "You see the future before others do."}, {"q": "Leadership style", "a": "As a visionary leader, you enjoy the thrill of imagining the unimaginable and inviting others to follow."} ] },
     "Artist": { "game_name": "Democratic Game", "color": "#e76f51", "title": "A Philosophical Leader", "growth_text": "This is the space an artist needs to grow.", "start_text": "You are matched with the Artist, a potential Philosophical Leader who pursues meaning where others pursue objectivity. Your gift is to create beauty and express truth, revealing what words alone cannot reach. You thrive in the Democratic Game, where freedom and authenticity encourage creation.", "play_text": "The Democratic Game fits you because it celebrates individuality and expression. It offers total creative control and the freedom to follow intuition wherever it leads. You prefer open space, where imagination and emotion can move without boundaries.", "quest_text": "You can ask and resolve “Why?” and move through “What if?”, “How can I?”, “Can I?”, and “What’s this?” questions, exploring every layer of meaning. You find fulfilment when your work reveals why something matters. Your curiosity connects hearts and restores meaning to others.", "legacy_text": "You are trusted to imagine freely, challenge norms, and reveal truth through creation. Artists are the voice of humanity, showing what is possible when feeling becomes form. They remind the world not just how to live, but why.", "traits": ["Creates freely", "Loves beauty", "Dislikes rules", "Shares feelings", "Pursues meaning"], "q_and_a": [ {"q": "What excites you?", "a": "Drawing, singing, writing, or creating something new."}, {"q": "What matters?", "a": "Freedom, beauty, and sharing your heart."}, {"q": "A great day looks like…", "a": "A picture, sound, or feeling comes to you. You follow it until it becomes real, then share it with others."}, {"q": "What you don’t like…", "a": "Being told there’s only one right way to do things."}, {"q": "Secret power", "a": "You remind people what really matters."}, {"q": "Leadership style", "a": "As a philosophical leader, you enjoy exploring boundaries and expressing meaning, beauty, and truth."} ] }
 }
+ROLE_NAMES=list(role_details.keys()) # index = k_band
 cube_definitions=[{'label':role,'size':(i,i,i),'color':details['color']} for i,(role,details) in enumerate(role_details.items())]; cube_definitions[0]['size']=(0.3,0.3,0.3)
 display_slider_metrics = [{'metric':"Freedom",'start_label':"Follow",'end_label':"Lead"},{'metric':"Security",'start_label':"Known",'end_label':"Unknown"},{'metric':"Responsibility",'start_label':"Social",'end_label':"Personal"},{'metric':"Control",'start_label':"Zero",'end_label':"Full"},{'metric':"Attention",'start_label':"Narrow",'end_label':"Broad"},{'metric':"Information",'start_label':"Consume",'end_label':"Create"}]
 
 # ==============================================================================
-# 3. PLOTTING HELPER FUNCTIONS & FLASK ROUTE
+# 3. FIGURE CACHE & FLASK ROUTES
 # ==============================================================================
-def make_cube(origin,size,color,visible=False):
-    x0,y0,z0=origin; dx,dy,dz=size; vertices=np.array([[x0,y0,z0],[x0+dx,y0,z0],[x0+dx,y0+dy,z0],[x0,y0+dy,z0],[x0,y0,z0+dz],[x0+dx,y0,z0+dz],[x0+dx,y0+dy,z0+dz],[x0,y0+dy,z0+dz]]); edges=[(0,1),(1,2),(2,3),(3,0),(4,5),(5,6),(6,7),(7,4),(0,4),(1,5),(2,6),(3,7)]
-    return [go.Scatter3d(x=[vertices[e[0],0],vertices[e[1],0]],y=[vertices[e[0],1],vertices[e[1],1]],z=[vertices[e[0],2],vertices[e[1],2]],mode="lines",line=dict(color=color,width=4),showlegend=False,visible=visible, hoverinfo='none') for e in edges]
-def make_sphere(center,radius,color, visible=False):
-    u=np.linspace(0,2*np.pi,40); v=np.linspace(0,np.pi,20); x=center[0]+radius*np.outer(np.cos(u),np.sin(v)); y=center[1]+radius*np.outer(np.sin(u),np.sin(v)); z=center[2]+radius*np.outer(np.ones(np.size(u)),np.cos(v))
-    return go.Mesh3d(x=x.flatten(),y=y.flatten(),z=z.flatten(),color=color,opacity=0.5,alphahull=0,showlegend=False,name="Player Sphere",lighting=dict(ambient=0.4,diffuse=0.8,specular=0.2,roughness=0.5),lightposition=dict(x=100,y=200,z=50), visible=visible, hoverinfo='none')
+GRAPH_CONFIG = {'displayModeBar':False, 'responsive': True}
 
-@app.route("/")
-def index():
-    if USE_MOCK_DATA:
-        mock_data={'user_id':['user_alpha'],'Freedom':[12],'Security':[13],'Responsibility':[15],'k_band':[3]}; df=pd.DataFrame(mock_data); df.columns=[c.lower().replace(' ','_') for c in df.columns]
-    else:
-        try:
-            response=requests.get(SHEETDB_URL); response.raise_for_status(); data=response.json(); df=pd.DataFrame(data); df.columns=[c.lower().replace(' ','_') for c in df.columns]
-        except Exception as e: return f"<p style='color:red;'>An error occurred: {e}</p>"
-    
-    user_id=request.args.get("user_id");
-    if not user_id: return "<p style='color:red;'>No user_id provided.</p>"
-    user_rows=df[df['user_id']==user_id]
-    if user_rows.empty: return f"<p style='color:red;'>No results for user: {user_id}</p>"
-    
-    latest=user_rows.iloc[-1]
-    try: f_score=int(latest['freedom']);s_score=int(latest['security']);r_score=int(latest['responsibility']);k_band=int(latest['k_band']);role=list(role_details.keys())[k_band]
-    except (ValueError,KeyError,IndexError) as e: return f"<p style='color:red;'>Data processing error: {e}</p>"
-    
-    fig=go.Figure();
-    # Create all cube and sphere traces upfront
-    for d in cube_definitions:
-        for trace in make_cube((0,0,0), d['size'], d['color'], visible=False): fig.add_trace(trace)
-    for i, d in enumerate(cube_definitions):
-        if i > 0: r = i / 2.0; fig.add_trace(make_sphere((r,r,r), r, d['color'], visible=False))
-    
-    # Set initial visibility
-    initial_visible_list = [False] * len(fig.data)
-    for i in range(k_band*12, k_band*12+12): initial_visible_list[i] = True
-    if k_band > 0:
-        num_cube_traces = len(cube_definitions) * 12
-        sphere_index = num_cube_traces + (k_band - 1)
-        initial_visible_list[sphere_index] = True
-    for i, visible in enumerate(initial_visible_list): fig.data[i].visible = visible
+def build_figure_fragments():
+    # Everything about the figure except which role is shown first is the same for every
+    # visitor, so it is built and serialized once per role at startup.
+    # One trace per cube and per sphere; the slider toggles them by role
+    with timed('figure_build'): traces, visibility = build_scene(cube_definitions, SPHERE_RESOLUTION); fig=go.Figure(data=traces);
         
     # Prepare slider data for Javascript (robust method)
     slider_steps_data = []
-    num_cube_traces = len(cube_definitions) * 12
     for i, d in enumerate(cube_definitions):
-        visibility_list = [False] * len(fig.data)
-        for j in range(i*12, i*12+12): visibility_list[j] = True
-        if i > 0:
-            sphere_index = num_cube_traces + (i - 1)
-            visibility_list[sphere_index] = True 
-        step_args = [ {"visible": visibility_list}, {"title.text": f"<b>{'Growth' if i>0 else 'Survival'} Game - {d['label']}</b>"} ]
+        step_args = [ {"visible": visibility[i]}, {"title.text": f"<b>{'Growth' if i>0 else 'Survival'} Game - {d['label']}</b>"} ]
         slider_steps_data.append({"label": d['label'], "args": step_args})
 
     growth_texts = [details['growth_text'] for role, details in role_details.items()]
-    initial_title=f"<b>{'Growth' if k_band > 0 else 'Survival'} Game - {role}</b>"
     axis_style=dict(range=[-0.5,5.5],tickvals=[0,1,2,3,4,5],gridcolor='#e0e0e0',zerolinecolor='rgba(0,0,0,0.3)',showbackground=False)
     
     # Final camera and margin settings
     fig.update_layout(
-        title=dict(text=initial_title,y=0.98,x=0.5,xanchor='center',yanchor='top',font=dict(size=20,color='#2c3e50')),
+        title=dict(y=0.98,x=0.5,xanchor='center',yanchor='top',font=dict(size=20,color='#2c3e50')),
         paper_bgcolor='white', plot_bgcolor='white', showlegend=False,
         scene=dict(
             xaxis={**axis_style, 'title': 'Control'}, yaxis={**axis_style, 'title': 'Attention'}, zaxis={**axis_style, 'title': 'Information'},
@@ -235,14 +323,190 @@ def index():
         autosize=True
     )
     
-    graph_html=fig.to_html(full_html=False,config={'displayModeBar':False, 'responsive': True},include_plotlyjs='cdn', div_id='plotly-graph')
-    return render_template_string(
-        HTML_TEMPLATE, user_id=user_id,role=role, f_score=f_score,s_score=s_score,r_score=r_score, 
-        role_info=role_details[role], graph_html=graph_html, 
+    # One serialized variant per role: initial visibility and title are the only differences
+    graph_html=[]
+    for step in slider_steps_data:
+        for trace, visible in zip(fig.data, step['args'][0]['visible']): trace.visible = visible
+        fig.layout.title.text = step['args'][1]['title.text']
+        with timed('figure_serialize'): graph_html.append(fig.to_html(full_html=False,config=GRAPH_CONFIG,include_plotlyjs='cdn', div_id='plotly-graph'))
+
+    # Scene bundle for the client-rendered shell: everything hidden, the page applies the user's step
+    fig.update_traces(visible=False); fig.layout.title.text = ''
+    scene={'figure': json.loads(fig.to_json()), 'config': GRAPH_CONFIG, 'steps': slider_steps_data, 'growth_texts': growth_texts,
+           'roles': role_details, 'metrics': [m['metric'] for m in display_slider_metrics]}
+    return {'graph_html': graph_html,
+            'slider_steps_json': json.dumps(slider_steps_data, separators=(',',':')),
+            'growth_texts_json': json.dumps(growth_texts, separators=(',',':')),
+            'scene_json': json.dumps(scene, separators=(',',':'))}
+
+def build_dashboard_assets():
+    # Hashed CSS/JS/scene files plus the shell page that links to them
+    assets=AssetBundle()
+    css_url=assets.add('dashboard.css', DASHBOARD_CSS, 'text/css'); js_url=assets.add('dashboard.js', DASHBOARD_JS, 'text/javascript')
+    scene_url=assets.add('scene.json', FIGURE_FRAGMENTS['scene_json'], 'application/json')
+    shell=app.jinja_env.from_string(SHELL_TEMPLATE).render(
+        css_url=css_url, js_url=js_url, scene_url=scene_url, api_url='/api/user/',
+        plotlyjs_url=f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js",
+        display_metrics=display_slider_metrics, k_band=0, cube_definitions=cube_definitions)
+    return assets, CompressedBody(shell)
+
+FIGURE_FRAGMENTS = build_figure_fragments()
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+DASHBOARD_ASSETS, DASHBOARD_SHELL = build_dashboard_assets()
+DASHBOARD_SHELL_ETAG = content_hash(DASHBOARD_SHELL.body)
+# Changes whenever the page template or the figure does, so a deploy invalidates every dashboard ETag
+DASHBOARD_VERSION = content_hash((HTML_TEMPLATE + FIGURE_FRAGMENTS['scene_json'] + ''.join(FIGURE_FRAGMENTS['graph_html'])).encode('utf-8'))
+page_cache = PageCache(PAGE_CACHE_SIZE)
+
+def user_etag(latest):
+    return content_hash(f"{DASHBOARD_VERSION}|{latest.user_id}|{latest.freedom}|{latest.security}|{latest.responsibility}|{latest.k_band}".encode('utf-8'))
+
+sheet_client=SheetDBClient(SHEETDB_URL, timeout=(3.05, SHEETDB_TIMEOUT), retries=SHEETDB_RETRIES, max_concurrency=SHEETDB_MAX_CONCURRENCY)
+# Searches for unknown user_ids run inside requests for ids taken from the URL: short timeout, no retries,
+# no queueing, a global rate limit and their own breaker, so they can never hold up workers or trip sheet refreshes.
+search_client=SheetDBClient(SHEETDB_URL, timeout=(1, SHEET_SEARCH_TIMEOUT), retries=0, pool_size=2, max_concurrency=2, queue_timeout=0,
+                            failure_threshold=3, reset_timeout=60, rate=SHEET_SEARCH_RATE, burst=5)
+
+def fetch_sheet():
+    if USE_MOCK_DATA: return [{'user_id':'user_alpha','Freedom':12,'Security':13,'Responsibility':15,'k_band':3}]
+    try:
+        with timed('upstream_fetch'): return sheet_client.fetch_all()
+    except Exception as e: UPSTREAM_ERRORS.inc(error=type(e).__name__); raise
+
+response_store=ResponseStore(fetch_sheet, ttl=SHEET_CACHE_TTL, snapshot_path=None if USE_MOCK_DATA else SHEET_SNAPSHOT_PATH)
+response_index=ResponseIndex(num_roles=len(role_details))
+score_analytics=ScoreAnalytics(SCORE_FIELDS, num_roles=len(role_details))
+response_index.listeners.append(score_analytics)
+
+def load_index(rebuild=False):
+    # Cheap when the store hands back the same rows: the index is only rebuilt or patched on change.
+    CACHE_REQUESTS.inc(cache='sheet', result='miss' if response_store.rows is None else 'stale' if response_store.is_stale() else 'hit')
+    rows=response_store.get()
+    with timed('index_update'): response_index.update(rows, rebuild=rebuild)
+    return response_index
+
+class UserLookupError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message); self.status=status
+
+def lookup_user(user_id):
+    # Returns (latest scores, role) or raises UserLookupError with the message shown to the user
+    try: idx=load_index()
+    except Exception as e: raise UserLookupError(f"An error occurred: {e}", 503)
+    if not user_id: raise UserLookupError("No user_id provided.", 400)
+    try:
+        latest=idx.get(user_id)
+        if latest is None and search_missing_user(user_id): latest=idx.get(user_id)
+    except ValueError as e: raise UserLookupError(f"Data processing error: {e}", 422)
+    if latest is None: raise UserLookupError(f"No results for user: {user_id}", 404)
+    return latest, ROLE_NAMES[latest.k_band]
+
+recent_misses={} # user_id -> time until which a failed server-side search is not repeated
+MISS_TTL=30
+
+def search_missing_user(user_id):
+    # A respondent who just submitted is not in the cached sheet yet: fetch only their rows.
+    # SheetDB search is case-insensitive and expands '*', so only exact matches are kept.
+    if USE_MOCK_DATA or not SHEET_SEARCH_ON_MISS or '*' in user_id or recent_misses.get(user_id, 0) > time.time(): return False
+    try:
+        with timed('upstream_search'): rows=search_client.search(user_id=user_id)
+    except Exception as e: UPSTREAM_ERRORS.inc(error=type(e).__name__); return False
+    rows=[row for row in rows if isinstance(row, dict) and any(normalize_column(k) == 'user_id' and str(v) == user_id for k, v in row.items())]
+    if rows: response_index.patch(rows)
+    if user_id not in response_index:
+        if len(recent_misses) > 10000: recent_misses.clear()
+        recent_misses[user_id]=time.time()+MISS_TTL; return False
+    return True
+
+SHEET_AGE=REGISTRY.register(Gauge("survey_sheet_age_seconds", "Age of the cached survey sheet."))
+INDEX_SIZE=REGISTRY.register(Gauge("survey_index_entries", "Rows and users in the response index.", ["kind"]))
+UPSTREAM_CLIENT=REGISTRY.register(Gauge("survey_upstream_client", "SheetDB client counters since start and circuit state (0 closed, 1 half-open, 2 open).", ["client", "stat"]))
+
+def collect_metrics():
+    SHEET_AGE.set(response_store.age() or 0)
+    for kind, value in response_index.stats().items(): INDEX_SIZE.set(value, kind=kind)
+    for client, status in (("sheet", sheet_client.status()), ("search", search_client.status())):
+        for stat, value in status.items(): UPSTREAM_CLIENT.set({"closed": 0, "half-open": 1, "open": 2}.get(value, value), client=client, stat=stat)
+REGISTRY.collectors.append(collect_metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_started=time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    if 'request_started' in g: REQUEST_SECONDS.observe(time.perf_counter()-g.request_started, endpoint=request.endpoint or 'unmatched', status=response.status_code)
+    return response
+
+@app.route("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route("/cache/status")
+def cache_status():
+    return jsonify(**response_store.status(), index=response_index.stats(), upstream=sheet_client.status(), search=search_client.status())
+
+@app.route("/cache/invalidate", methods=["POST"])
+def invalidate_cache():
+    if not CACHE_INVALIDATE_TOKEN: return jsonify(error="forbidden: set CACHE_INVALIDATE_TOKEN to enable cache invalidation"), 403
+    if not hmac.compare_digest(request.headers.get("X-Invalidate-Token", "").encode(), CACHE_INVALIDATE_TOKEN.encode()): return jsonify(error="forbidden"), 403
+    try: response_store.invalidate(); load_index(rebuild=True)
+    except Exception as e: return jsonify(error=str(e), **response_store.status()), 502
+    return cache_status()
+
+@app.route("/api/user/<path:user_id>") # user_ids may contain "/", as they can in ?user_id=
+def api_user(user_id):
+    try: latest,role=lookup_user(user_id)
+    except UserLookupError as e: return jsonify(error=str(e)), e.status
+    # Percentile ranks move as other users answer, so the cohort fingerprint is part of the validator
+    etag=content_hash(f"{user_etag(latest)}|{score_analytics.fingerprint(ROLE_NAMES)}".encode('utf-8'))
+    payload=lambda: CompressedBody(app.json.dumps(user_payload(latest, role)))
+    return cacheable_response(etag, payload, 'application/json', DASHBOARD_CACHE_CONTROL, weak=True)
+
+@app.route("/analytics")
+def analytics():
+    try: load_index()
+    except Exception as e: return jsonify(error=f"An error occurred: {e}"), 503
+    body,etag=score_analytics.summary(ROLE_NAMES)
+    return cacheable_response(etag, lambda: CompressedBody(body), 'application/json', DASHBOARD_CACHE_CONTROL, weak=True)
+
+@app.route("/dashboard")
+def dashboard_shell():
+    # Same page for every user (user_id is read client-side), so it is shared by browser and CDN caches
+    return cacheable_response(DASHBOARD_SHELL_ETAG, lambda: DASHBOARD_SHELL, 'text/html', f"public, max-age={SHELL_MAX_AGE}")
+
+@app.route("/assets/<filename>")
+def dashboard_asset(filename):
+    response=DASHBOARD_ASSETS.response(filename)
+    if response is None: abort(404)
+    return response
+
+@app.route("/")
+def index():
+    user_id=request.args.get("user_id");
+    try: latest,role=lookup_user(user_id)
+    except UserLookupError as e: return f"<p style='color:red;'>{e}</p>"
+    
+    # Revalidations of an unchanged dashboard are answered before anything is rendered
+    etag=user_etag(latest)
+    return cacheable_response(etag, lambda: page_cache.get_or_build(etag, lambda: render_dashboard(latest, role)),
+                              'text/html', DASHBOARD_CACHE_CONTROL, latest.updated_at, weak=True)
+
+def user_payload(latest, role, analytics=None):
+    scores={'freedom': latest.freedom, 'security': latest.security, 'responsibility': latest.responsibility}
+    return dict(user_id=latest.user_id, role=role, k_band=latest.k_band, scores=scores,
+                percentile_ranks=(analytics or score_analytics).percentile_ranks(scores))
+
+def render_dashboard(latest, role):
+    f_score,s_score,r_score,k_band=latest.freedom,latest.security,latest.responsibility,latest.k_band
+    fragments=FIGURE_FRAGMENTS
+    with timed('render'): return render_template(
+        DASHBOARD_TEMPLATE, user_id=latest.user_id,role=role, f_score=f_score,s_score=s_score,r_score=r_score, 
+        role_info=role_details[role], graph_html=fragments['graph_html'][k_band], 
         display_metrics=display_slider_metrics, k_band=k_band, 
         cube_definitions=cube_definitions, 
-        slider_steps_json=jsonify(slider_steps_data).get_data(as_text=True),
-        growth_texts_json=jsonify(growth_texts).get_data(as_text=True)
+        slider_steps_json=fragments['slider_steps_json'],
+        growth_texts_json=fragments['growth_texts_json']
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+import hashlib
+import os
+
+from http_cache import CompressedBody, cacheable_response
+
+# ==============================================================================
+# STATIC ASSETS
+# Assets generated at startup are served from memory under content-hashed
+# filenames, so browsers and CDNs can keep them for a year: a changed asset
+# gets a new URL instead of a revalidation.
+# ==============================================================================
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={365 * 24 * 3600}, immutable"
+
+def content_hash(body):
+    return hashlib.sha256(body).hexdigest()[:16]
+
+class AssetBundle:
+    def __init__(self, url_prefix="/assets/"):
+        self.url_prefix = url_prefix
+        self.files = {}  # hashed filename -> (CompressedBody, mimetype, etag)
+        self.names = {}  # logical name -> hashed filename
+
+    def add(self, name, content, mimetype):
+        body = content.encode("utf-8") if isinstance(content, str) else content
+        etag = content_hash(body)
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{etag}{ext}"
+        self.files[filename] = (CompressedBody(body), mimetype, etag)
+        self.names[name] = filename
+        return self.url(name)
+
+    def url(self, name):
+        return self.url_prefix + self.names[name]
+
+    def response(self, filename):
+        if filename not in self.files: return None
+        body, mimetype, etag = self.files[filename]
+        return cacheable_response(etag, lambda: body, mimetype, IMMUTABLE_CACHE_CONTROL)
@@ -0,0 +1,104 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import quote
+
+import app
+from analytics import ScoreAnalytics
+from response_index import SCORE_FIELDS, ResponseIndex
+
+# ==============================================================================
+# BULK REPORTS
+# Renders the dashboards of a whole cohort in one go: the sheet is loaded and
+# indexed once (latest row per user_id), then users are rendered in chunks
+# across a process pool with the same template and cached figure as index().
+# Each worker writes its files straight to disk.
+#
+#   python batch.py --out reports/                   # every user in the sheet
+#   python batch.py --input sheet.json --users class_7b.txt --format html,json --gzip
+# ==============================================================================
+def load_rows(path=None):
+    if path is None: return app.fetch_sheet()
+    with open(path, encoding="utf-8") as fh: return json.load(fh)
+
+def output_path(out_dir, user_id, ext, compress):
+    # user_ids are percent-encoded so any id maps to one safe, reversible filename
+    return os.path.join(out_dir, quote(str(user_id), safe="") + ext + (".gz" if compress else ""))
+
+def write_file(path, text, compress):
+    data = text.encode("utf-8")
+    with open(path, "wb") as fh: fh.write(gzip.compress(data, mtime=0) if compress else data)
+
+def render_chunk(users, out_dir, formats, compress, analytics):
+    # Runs in a worker process; `users` is a list of UserScores tuples.
+    written = 0
+    with app.app.app_context():
+        for latest in users:
+            role = app.ROLE_NAMES[latest.k_band]
+            if "html" in formats:
+                write_file(output_path(out_dir, latest.user_id, ".html", compress), app.render_dashboard(latest, role), compress)
+            if "json" in formats:
+                write_file(output_path(out_dir, latest.user_id, ".json", compress), json.dumps(app.user_payload(latest, role, analytics)), compress)
+            written += 1
+    return written
+
+def select_users(index, user_ids=None):
+    users, errors = [], {}
+    for user_id in (user_ids if user_ids is not None else index.user_ids):
+        try: latest = index.get(user_id)
+        except ValueError as e: errors[user_id] = str(e); continue
+        if latest is None: errors[user_id] = "no results"
+        else: users.append(latest)
+    return users, errors
+
+def run(rows, out_dir, user_ids=None, formats=("html",), compress=False, workers=None, chunk_size=250, progress=sys.stderr):
+    started = time.perf_counter()
+    index = ResponseIndex(num_roles=len(app.role_details))
+    analytics = ScoreAnalytics(SCORE_FIELDS, num_roles=len(app.role_details))
+    index.listeners.append(analytics)
+    index.update(rows)
+    users, errors = select_users(index, user_ids)
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = [users[i:i + chunk_size] for i in range(0, len(users), chunk_size)]
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_chunk, chunk, out_dir, formats, compress, analytics) for chunk in chunks]
+        for future in as_completed(futures):
+            done += future.result()
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress.write(f"\r{done}/{len(users)} dashboards ({done / elapsed:.0f}/s)")
+                progress.flush()
+    if progress: progress.write("\n")
+    return {"rows": index.rows_indexed, "users": len(users), "written": done, "errors": errors,
+            "seconds": round(time.perf_counter() - started, 2)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render dashboards for every user (or a cohort) in the survey sheet.")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--input", help="JSON file of sheet rows instead of fetching SHEETDB_URL")
+    parser.add_argument("--users", help="file with one user_id per line; default: every user in the sheet")
+    parser.add_argument("--format", default="html", help="comma-separated: html, json")
+    parser.add_argument("--gzip", action="store_true", help="write .gz files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=250, help="users per worker task")
+    args = parser.parse_args(argv)
+
+    formats = {f.strip() for f in args.format.split(",") if f.strip()}
+    if not formats <= {"html", "json"}: parser.error("--format accepts html and json")
+    user_ids = None
+    if args.users:
+        with open(args.users, encoding="utf-8") as fh: user_ids = [line.strip() for line in fh if line.strip()]
+    summary = run(load_rows(args.input), args.out, user_ids, formats, args.gzip, args.workers, args.chunk_size)
+    for user_id, error in summary["errors"].items(): print(f"skipped {user_id}: {error}", file=sys.stderr)
+    print(f"Rendered {summary['written']} of {summary['users']} users from {summary['rows']} rows "
+          f"in {summary['seconds']}s ({len(summary['errors'])} skipped) -> {args.out}")
+    # Invalid rows in the sheet are skipped; a requested user that could not be rendered is a failure.
+    return 1 if user_ids is not None and summary["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from metrics import STAGE_SECONDS
+from mock_sheetdb import MockSheetDB, synthetic_rows
+
+# ==============================================================================
+# BENCHMARK
+# Drives the dashboard routes through Flask's test client against a local
+# SheetDB stand-in serving synthetic sheets, and reports per sheet size:
+#   load        upstream fetch + index build after /cache/invalidate
+#   first_view  index() for random users (page cache mostly cold on big sheets)
+#   revalidate  index() with the ETag from a previous view (304 path)
+#   api         /api/user/<user_id>
+# with throughput, p50/p99 latency, mean time per pipeline stage and memory.
+#
+#   python bench.py --sizes 1000,10000,100000,1000000 --requests 2000 > bench_output.txt
+# ==============================================================================
+STAGES = ("upstream_fetch", "index_update", "render", "compress")
+BENCH_TOKEN = "bench"
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as fh: return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, KiB on Linux
+
+def stage_totals():
+    return {stage: STAGE_SECONDS.summary(stage=stage) for stage in STAGES}
+
+def drive(client, paths, headers_for=lambda path: {}):
+    latencies = np.empty(len(paths))
+    started = time.perf_counter()
+    for i, path in enumerate(paths):
+        t = time.perf_counter()
+        response = client.get(path, headers={"Accept-Encoding": "gzip", **headers_for(path)})
+        response.get_data()
+        latencies[i] = time.perf_counter() - t
+    elapsed = time.perf_counter() - started
+    return {"requests": len(paths), "rps": round(len(paths) / elapsed, 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1e3, 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)) * 1e3, 3)}
+
+def bench_size(app, client, mock, n_rows, n_requests, rng):
+    mock.set_rows(synthetic_rows(n_rows, seed=n_rows))
+    before = stage_totals()
+    started = time.perf_counter()
+    response = client.post("/cache/invalidate", headers={"X-Invalidate-Token": BENCH_TOKEN})
+    if response.status_code != 200: raise RuntimeError(f"Loading {n_rows} rows failed: {response.get_json()}")
+    result = {"rows": n_rows, "users": len(app.response_index), "load_s": round(time.perf_counter() - started, 3)}
+
+    users = [rng.choice(app.response_index.user_ids) for _ in range(n_requests)]
+    paths = [f"/?user_id={user_id}" for user_id in users]
+    before_views = stage_totals()
+    result["first_view"] = drive(client, paths)
+    after_views = stage_totals()
+    etags = {path: client.get(path).headers["ETag"] for path in set(paths)}
+    result["revalidate"] = drive(client, paths, lambda path: {"If-None-Match": etags[path]})
+    result["api"] = drive(client, [f"/api/user/{user_id}" for user_id in users])
+
+    # Mean seconds per occurrence of each stage: load stages over the reload, view stages over first views
+    result["stages_ms"] = {}
+    for stage in STAGES:
+        a, b = (before, before_views) if stage in ("upstream_fetch", "index_update") else (before_views, after_views)
+        count, total = b[stage][0] - a[stage][0], b[stage][1] - a[stage][1]
+        result["stages_ms"][stage] = round(total / count * 1e3, 3) if count else None
+    result["rss_mb"] = round(rss_mb(), 1)
+    result["index_kb"] = round(app.response_index.stats()["bytes"] / 1024, 1)
+    return result
+
+def format_result(r):
+    lines = [f"rows={r['rows']:,} users={r['users']:,} load={r['load_s']}s rss={r['rss_mb']}MB index={r['index_kb']}KB"]
+    for scenario in ("first_view", "revalidate", "api"):
+        s = r[scenario]
+        lines.append(f"  {scenario:<11} {s['rps']:>9} req/s  p50={s['p50_ms']}ms  p99={s['p99_ms']}ms")
+    lines.append("  stages (mean ms): " + "  ".join(f"{k}={v}" for k, v in r["stages_ms"].items()))
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pipeline against synthetic sheets.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated sheet sizes in rows")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    mock = MockSheetDB([]).start()
+    snapshot_dir = tempfile.mkdtemp(prefix="survey-bench-")
+    # The app reads its data source from the environment at import time
+    os.environ.update(SHEETDB_URL=mock.url, SHEET_SNAPSHOT_PATH=os.path.join(snapshot_dir, "sheet.json"),
+                      SHEET_CACHE_TTL="86400", SHEET_SEARCH_ON_MISS="0", SHEETDB_TIMEOUT="300",
+                      CACHE_INVALIDATE_TOKEN=BENCH_TOKEN)
+    import app
+    client = app.app.test_client()
+    rng = random.Random(args.seed)
+
+    results = []
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            result = bench_size(app, client, mock, size, args.requests, rng)
+            results.append(result)
+            print(format_result(result)); sys.stdout.flush()
+    finally:
+        mock.stop()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh: json.dump(results, fh, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
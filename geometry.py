@@ -0,0 +1,48 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# ==============================================================================
+# FIGURE GEOMETRY
+# Each cube is drawn as a single line trace whose 12 edges are separated by NaN
+# gaps, so a scene is one trace per cube plus one per sphere.
+# ==============================================================================
+CORNERS = np.array([[0,0,0],[1,0,0],[1,1,0],[0,1,0],[0,0,1],[1,0,1],[1,1,1],[0,1,1]], dtype=float)
+EDGES = np.array([(0,1),(1,2),(2,3),(3,0),(4,5),(5,6),(6,7),(7,4),(0,4),(1,5),(2,6),(3,7)])
+COORD_DTYPE = np.float32 # plotly ships arrays as binary; single precision halves the payload
+
+def cube_segments(origin, size):
+    # (12 edges x [start, end, gap]) flattened to a (36, 3) polyline
+    vertices = np.asarray(origin, dtype=float) + CORNERS * np.asarray(size, dtype=float)
+    segments = np.full((len(EDGES), 3, 3), np.nan)
+    segments[:, :2] = vertices[EDGES]
+    return segments.reshape(-1, 3).astype(COORD_DTYPE)
+
+def sphere_points(center, radius, resolution=(40, 20)):
+    # Latitude rings without the repeated seam column and pole points of an np.outer grid
+    n_u, n_v = resolution
+    u = np.linspace(0, 2*np.pi, n_u, endpoint=False)
+    v = np.linspace(0, np.pi, n_v)[1:-1]
+    ring = np.stack([np.outer(np.cos(u), np.sin(v)), np.outer(np.sin(u), np.sin(v)), np.broadcast_to(np.cos(v), (n_u, len(v)))], axis=-1).reshape(-1, 3)
+    points = np.vstack([[0, 0, 1], ring, [0, 0, -1]])
+    return (np.asarray(center, dtype=float) + radius * points).astype(COORD_DTYPE)
+
+def make_cube(origin,size,color,visible=False):
+    x,y,z = cube_segments(origin, size).T
+    return go.Scatter3d(x=x,y=y,z=z,mode="lines",line=dict(color=color,width=4),connectgaps=False,showlegend=False,visible=visible, hoverinfo='none')
+
+def make_sphere(center,radius,color, visible=False, resolution=(40, 20)):
+    x,y,z = sphere_points(center, radius, resolution).T
+    return go.Mesh3d(x=x,y=y,z=z,color=color,opacity=0.5,alphahull=0,showlegend=False,name="Player Sphere",lighting=dict(ambient=0.4,diffuse=0.8,specular=0.2,roughness=0.5),lightposition=dict(x=100,y=200,z=50), visible=visible, hoverinfo='none')
+
+def build_scene(cube_definitions, sphere_resolution=(40, 20)):
+    # Returns the traces and, for each role, the visibility list that shows its cube and sphere.
+    traces = [make_cube((0,0,0), d['size'], d['color']) for d in cube_definitions]
+    sphere_index = {}
+    for i, d in enumerate(cube_definitions):
+        if i > 0: r = i / 2.0; sphere_index[i] = len(traces); traces.append(make_sphere((r,r,r), r, d['color'], resolution=sphere_resolution))
+    visibility = []
+    for i in range(len(cube_definitions)):
+        visible = [False] * len(traces); visible[i] = True
+        if i in sphere_index: visible[sphere_index[i]] = True
+        visibility.append(visible)
+    return traces, visibility
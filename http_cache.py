@@ -0,0 +1,87 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+from metrics import CACHE_REQUESTS, timed
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# ==============================================================================
+# HTTP CACHING
+# Validators (ETag / Last-Modified) are checked before anything is rendered, so
+# a browser or proxy revalidating an unchanged page gets a bodyless 304. Bodies
+# are compressed once per encoding and memoized with the page.
+# ==============================================================================
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # higher qualities cost far more CPU for a few percent
+MIN_COMPRESS_SIZE = 1024
+
+def accepted_encoding():
+    if brotli is not None and request.accept_encodings['br']: return 'br'
+    if request.accept_encodings['gzip']: return 'gzip'
+    return None
+
+def compress(body, encoding):
+    if encoding == 'br': return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class CompressedBody:
+    # A response body plus its lazily built compressed variants
+    def __init__(self, body):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.variants = {}
+
+    def encode(self, encoding):
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE: return self.body, None
+        if encoding not in self.variants:
+            with timed('compress'): self.variants[encoding] = compress(self.body, encoding)
+        return self.variants[encoding], encoding
+
+def is_not_modified(etag, last_modified=None):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if request.if_none_match: return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since is not None:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+def cacheable_response(etag, build, mimetype, cache_control, last_modified=None, weak=False):
+    # build() returns a CompressedBody and is only called when the client's copy is out of date.
+    if request.method in ('GET', 'HEAD') and is_not_modified(etag, last_modified):
+        CACHE_REQUESTS.inc(cache='http', result='not_modified')
+        response = Response(status=304)
+    else:
+        CACHE_REQUESTS.inc(cache='http', result='full')
+        body, encoding = build().encode(accepted_encoding())
+        response = Response(body, mimetype=mimetype)
+        if encoding: response.content_encoding = encoding
+    response.set_etag(etag, weak=weak)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    if last_modified: response.last_modified = int(last_modified)
+    return response
+
+class PageCache:
+    # Small LRU of rendered pages keyed by ETag
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, render):
+        with self._lock:
+            page = self.pages.get(key)
+            if page is not None:
+                self.pages.move_to_end(key)
+                CACHE_REQUESTS.inc(cache='page', result='hit')
+                return page
+        CACHE_REQUESTS.inc(cache='page', result='miss')
+        page = CompressedBody(render())
+        with self._lock:
+            self.pages[key] = page
+            while len(self.pages) > self.max_size: self.pages.popitem(last=False)
+        return page
@@ -0,0 +1,110 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# ==============================================================================
+# METRICS
+# Minimal Prometheus-style metrics (text exposition format 0.0.4) without an
+# extra dependency. Values are per process: with several gunicorn workers a
+# scrape of /metrics reports the worker that happened to answer it.
+# ==============================================================================
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values):
+    if not names: return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock: items = sorted(self.values.items())
+        for key, value in items: lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock: self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock: self.values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound: state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def summary(self, **labels):
+        # (count, sum) for one label set; used by bench.py
+        with self._lock:
+            state = self.values.get(self._key(labels))
+            return (state[2], state[1]) if state else (0, 0.0)
+
+    def _samples(self, key, state):
+        buckets, total, count = state
+        lines = [f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + (bound,))} {n}" for bound, n in zip(self.buckets, buckets)]
+        lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + ('+Inf',))} {count}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []  # called before rendering to refresh gauges
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        for collect in self.collectors: collect()
+        lines = []
+        for metric in self.metrics: lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.register(Histogram("survey_stage_seconds", "Time spent per dashboard pipeline stage.", ["stage"]))
+REQUEST_SECONDS = REGISTRY.register(Histogram("survey_request_seconds", "Request latency by endpoint.", ["endpoint", "status"]))
+CACHE_REQUESTS = REGISTRY.register(Counter("survey_cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"]))
+UPSTREAM_ERRORS = REGISTRY.register(Counter("survey_upstream_errors_total", "Failed sheet fetches by error type.", ["error"]))
+
+@contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try: yield
+    finally: STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
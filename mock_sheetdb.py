@@ -0,0 +1,107 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# ==============================================================================
+# LOCAL SHEETDB STAND-IN
+# Mimics the parts of the SheetDB API the app uses: GET <api> returns every row
+# and GET <api>/search?column=value the matching ones. `delay` and `fail_rate`
+# simulate a slow or flaky upstream.
+# ==============================================================================
+def synthetic_rows(n_rows, n_users=None, num_roles=6, seed=0):
+    # Survey rows as SheetDB returns them: string values, some users answering more than once.
+    rng = random.Random(seed)
+    n_users = n_users or max(1, int(n_rows * 0.8))
+    return [{"user_id": f"user_{rng.randrange(n_users):07d}", "Freedom": str(rng.randint(0, 20)),
+             "Security": str(rng.randint(0, 20)), "Responsibility": str(rng.randint(0, 20)),
+             "k_band": str(rng.randrange(num_roles))} for _ in range(n_rows)]
+
+class MockSheetDB:
+    def __init__(self, rows, host="127.0.0.1", port=0, api_path="/api/v1/mock", delay=0.0, fail_rate=0.0, fail_status=503):
+        self.rows = rows
+        self.api_path = api_path.rstrip("/")
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.requests_served = 0
+        self._body = None
+        self._rng = random.Random(0)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.api_path}"
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self._body = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-sheetdb", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _respond(self, path, query):
+        self.requests_served += 1
+        if self.delay: time.sleep(self.delay)
+        if self.fail_rate and self._rng.random() < self.fail_rate: return self.fail_status, {"error": "simulated failure"}
+        if path == self.api_path:
+            if self._body is None: self._body = json.dumps(self.rows).encode("utf-8")
+            return 200, self._body
+        if path == self.api_path + "/search":
+            filters = dict(parse_qsl(query))
+            return 200, [row for row in self.rows if all(str(row.get(k)) == v for k, v in filters.items())]
+        return 404, {"error": "not found"}
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                status, payload = mock._respond(parts.path.rstrip("/"), parts.query)
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try: self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError): pass  # client gave up (timeout tests)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic survey rows through a SheetDB-like API.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=None)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+    mock = MockSheetDB(synthetic_rows(args.rows, args.users), port=args.port, delay=args.delay, fail_rate=args.fail_rate, fail_status=args.fail_status)
+    print(f"Serving {args.rows} rows at {mock.url} (SHEETDB_URL={mock.url})")
+    try: mock._server.serve_forever()
+    except KeyboardInterrupt: pass
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+SCORE_FIELDS = ('freedom', 'security', 'responsibility', 'k_band')
+UserScores = namedtuple('UserScores', ['user_id', 'freedom', 'security', 'responsibility', 'k_band', 'updated_at'])
+
+def normalize_column(name):
+    return name.lower().replace(' ', '_')
+
+# ==============================================================================
+# RESPONSE INDEX
+# user_id -> latest sheet row, stored as one int16 row per user. Scores are
+# validated once when rows are loaded; appended rows are patched in without
+# touching the rest of the index. updated_at records when a user's latest row
+# last changed, which survives full rebuilds for users whose row is unchanged.
+# ==============================================================================
+class ResponseIndex:
+    def __init__(self, num_roles, capacity=1024):
+        self.num_roles = num_roles
+        self.slots = {}       # user_id -> slot
+        self.user_ids = []    # slot -> user_id
+        self.scores = np.zeros((capacity, len(SCORE_FIELDS)), dtype=np.int16)
+        self.errors = {}      # slot -> validation error of that user's latest row
+        self.updated_at = np.zeros(capacity, dtype=np.float64)
+        self.rows_indexed = 0
+        self.version = 0
+        self._rows = None
+        self._previous = None
+        self.listeners = []   # notified of every change, see _notify
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __contains__(self, user_id):
+        # True for every indexed user, including those whose latest row failed validation
+        return user_id in self.slots
+
+    def get(self, user_id):
+        # None for unknown users; ValueError if their latest row failed validation.
+        with self._lock:
+            slot = self.slots.get(user_id)
+            if slot is None: return None
+            if slot in self.errors: raise ValueError(self.errors[slot])
+            return UserScores(user_id, *(int(v) for v in self.scores[slot]), float(self.updated_at[slot]))
+
+    def stats(self):
+        return {"rows": self.rows_indexed, "users": len(self.user_ids), "invalid_users": len(self.errors),
+                "bytes": self.scores[:len(self.user_ids)].nbytes}
+
+    def update(self, rows, rebuild=False):
+        # Re-index only when the sheet actually changed; a sheet that grew by
+        # appending rows is patched with just the new tail.
+        with self._lock:
+            if rows is self._rows and not rebuild: return False
+            n = self.rows_indexed
+            # Only a sheet whose indexed rows are all unchanged counts as appended to;
+            # a row edited in place means a full rebuild.
+            appended = (not rebuild and self._rows is not None and 0 < n <= len(rows)
+                        and rows[:n] == self._rows[:n])
+            if not appended: self._clear()
+            self._apply(rows[self.rows_indexed:], time.time())
+            self._previous = None
+            self._rows = rows
+            self.rows_indexed = len(rows)
+            self.version += 1
+            return True
+
+    def patch(self, rows):
+        # Apply rows fetched outside the full sheet (e.g. a server-side search) without
+        # moving the append cursor; they are seen again, unchanged, once the sheet catches up.
+        with self._lock:
+            self._apply(rows, time.time())
+            self.version += 1
+
+    def _clear(self):
+        for listener in self.listeners: listener.reset()
+        self._previous = (self.slots, self.scores, self.errors, self.updated_at)
+        self.scores = np.zeros_like(self.scores)
+        self.updated_at = np.zeros_like(self.updated_at)
+        self.slots = {}
+        self.user_ids = []
+        self.errors = {}
+        self.rows_indexed = 0
+
+    def _apply(self, rows, now):
+        if not rows: return
+        df = pd.DataFrame(rows)
+        df.columns = [normalize_column(c) for c in df.columns]
+        if 'user_id' not in df.columns: raise KeyError('user_id')
+        # Later rows win: keep each user's last row in this batch only.
+        df = df[df['user_id'].notna()].drop_duplicates('user_id', keep='last')
+        user_ids = df['user_id'].tolist()
+        values = np.zeros((len(df), len(SCORE_FIELDS)), dtype=np.int16)
+        errors = [None] * len(df)
+        for col, field in enumerate(SCORE_FIELDS):
+            if field not in df.columns:
+                errors = [e or f"missing {field} column" for e in errors]
+                continue
+            raw = df[field]
+            numeric = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+            upper = self.num_roles - 1 if field == 'k_band' else np.iinfo(np.int16).max
+            bad = ~np.isfinite(numeric) | (numeric < 0) | (numeric > upper) | (numeric != np.floor(numeric))
+            for i in np.flatnonzero(bad):
+                errors[i] = errors[i] or f"invalid {field} value {raw.iloc[i]!r}"
+            values[:, col] = np.where(bad, 0, numeric).astype(np.int16)
+        self._store(user_ids, values, errors, now)
+
+    def _store(self, user_ids, values, errors, now):
+        slots = np.empty(len(user_ids), dtype=np.intp)
+        error_changed = np.zeros(len(user_ids), dtype=bool)
+        was_valid = np.zeros(len(user_ids), dtype=bool)
+        for i, user_id in enumerate(user_ids):
+            slot = self.slots.get(user_id)
+            if slot is None:
+                slot = self.slots[user_id] = len(self.user_ids)
+                self.user_ids.append(user_id)
+            else:
+                was_valid[i] = slot not in self.errors
+            slots[i] = slot
+            error_changed[i] = self.errors.get(slot) != errors[i]
+            if errors[i]: self.errors[slot] = errors[i]
+            else: self.errors.pop(slot, None)
+        if len(self.user_ids) > len(self.scores):
+            capacity = max(len(self.user_ids), 2 * len(self.scores))
+            self.scores = _grow(self.scores, capacity)
+            self.updated_at = _grow(self.updated_at, capacity)
+        changed = (self.scores[slots] != values).any(axis=1) | error_changed | (self.updated_at[slots] == 0)
+        if self._previous is not None: changed &= self._changed_since_previous(user_ids, values, errors)
+        self.updated_at[slots[changed]] = now
+        if self.listeners:
+            is_valid = np.array([not e for e in errors], dtype=bool)
+            self._notify(self.scores[slots[was_valid]], values[is_valid])
+        self.scores[slots] = values
+
+    def _notify(self, removed, added):
+        # Listeners see each change as the valid score rows it replaced and the ones that replaced them.
+        for listener in self.listeners: listener.apply(removed, added)
+
+    def _changed_since_previous(self, user_ids, values, errors):
+        # On a full rebuild, carry over updated_at of users whose latest row is unchanged.
+        slots, scores, prev_errors, updated_at = self._previous
+        changed = np.ones(len(user_ids), dtype=bool)
+        for i, user_id in enumerate(user_ids):
+            slot = slots.get(user_id)
+            if slot is not None and prev_errors.get(slot) == errors[i] and (scores[slot] == values[i]).all():
+                self.updated_at[self.slots[user_id]] = updated_at[slot]
+                changed[i] = False
+        return changed
+
+def _grow(array, capacity):
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
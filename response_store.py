@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: fall back to per-process locking only
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+# ==============================================================================
+# RESPONSE STORE
+# Keeps the survey sheet in process memory and mirrors it to a local snapshot
+# file so every gunicorn worker shares one copy. Expired data is served while
+# a single background refresh runs (stale-while-revalidate); if the upstream
+# is down the last good copy keeps being served.
+# ==============================================================================
+class ResponseStore:
+    def __init__(self, fetch, ttl=300, snapshot_path=None, error_backoff=30):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.error_backoff = error_backoff
+        self.snapshot_path = snapshot_path
+        self.rows = None
+        self.fetched_at = 0.0
+        self.last_error = None
+        self._snapshot_mtime = 0.0
+        self._lock = threading.Lock()          # guards _refreshing only; never held during I/O
+        self._refresh_lock = threading.Lock()  # held for the duration of a fetch
+        self._refreshing = False
+        self._retry_at = 0.0
+        if snapshot_path: self._make_private_dir(os.path.dirname(snapshot_path) or ".")
+
+    def age(self):
+        return time.time() - self.fetched_at if self.rows is not None else None
+
+    def is_stale(self):
+        return self.rows is None or self.age() >= self.ttl
+
+    def get(self):
+        # Another worker may have refreshed the snapshot since our last look.
+        self._load_snapshot()
+        if self.rows is None:
+            # Nothing to serve yet: the first request has to wait for the data.
+            self.refresh()
+        elif self.is_stale() and time.time() >= self._retry_at:
+            self.refresh_async()
+        return self.rows
+
+    def refresh(self, force=False):
+        # A forced refresh raises when its fetch failed, even though stale rows are still served.
+        # Only the cold start and invalidate() wait here; stale reads are served by refresh_async().
+        with self._refresh_lock: error = self._refresh_locked(blocking=True, force=force)
+        if self.rows is None: raise self.last_error or RuntimeError("No survey data available")
+        if force and error is not None: raise error
+        return self.rows
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing: return False
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="response-store-refresh", daemon=True).start()
+        return True
+
+    def invalidate(self):
+        return self.refresh(force=True)
+
+    def status(self):
+        return {"rows": len(self.rows) if self.rows is not None else 0, "age": self.age(), "ttl": self.ttl,
+                "stale": self.is_stale(), "refreshing": self._refreshing or self._refresh_lock.locked(),
+                "last_error": str(self.last_error) if self.last_error else None}
+
+    def _background_refresh(self):
+        # Skipped when a blocking refresh is already fetching.
+        try:
+            if self._refresh_lock.acquire(blocking=False):
+                try: self._refresh_locked(blocking=False)
+                finally: self._refresh_lock.release()
+        except Exception:
+            log.exception("Background refresh of response store failed")
+        finally:
+            with self._lock: self._refreshing = False
+
+    def _refresh_locked(self, blocking, force=False):
+        # Returns the fetch error, if this call fetched and failed.
+        with _FileLock(self.snapshot_path + ".lock" if self.snapshot_path else None, blocking) as acquired:
+            # A worker that lost the race for the snapshot lock serves what is on disk.
+            if not acquired:
+                self._load_snapshot()
+                return
+            # The worker that held the lock before us may just have written fresh data.
+            self._load_snapshot()
+            if not force and not self.is_stale(): return
+            try:
+                rows = self.fetch()
+            except Exception as e:
+                self.last_error = e
+                self._retry_at = time.time() + self.error_backoff
+                log.warning("Response store refresh failed, serving stale data: %s", e)
+                self._load_snapshot(force=self.rows is None)
+                return e
+            self._set(rows, time.time())
+            self.last_error = None
+            self._write_snapshot()
+
+    def _set(self, rows, fetched_at):
+        self.rows = rows
+        self.fetched_at = fetched_at
+
+    @staticmethod
+    def _make_private_dir(directory):
+        # Other local users must not be able to plant a snapshot or hold the lock file.
+        try: os.makedirs(directory, mode=0o700, exist_ok=True)
+        except OSError: log.exception("Could not create snapshot directory %s", directory)
+
+    def _load_snapshot(self, force=False):
+        if not self.snapshot_path: return False
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime
+            if not force and mtime <= self._snapshot_mtime: return False
+            with open(self.snapshot_path, encoding="utf-8") as fh: snapshot = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        self._snapshot_mtime = mtime
+        if snapshot.get("fetched_at", 0) > self.fetched_at or self.rows is None:
+            self._set(snapshot["rows"], snapshot["fetched_at"])
+        return True
+
+    def _write_snapshot(self):
+        if not self.snapshot_path: return
+        directory = os.path.dirname(self.snapshot_path) or "."
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".sheet-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"fetched_at": self.fetched_at, "rows": self.rows}, fh)
+            os.replace(tmp_path, self.snapshot_path)
+            self._snapshot_mtime = os.stat(self.snapshot_path).st_mtime
+        except OSError:
+            log.exception("Could not write response store snapshot to %s", self.snapshot_path)
+
+
+class _FileLock:
+    # Inter-process lock; in non-blocking mode yields False when another worker holds it.
+    def __init__(self, path, blocking=False):
+        self.path = path
+        self.blocking = blocking
+        self.fh = None
+
+    def __enter__(self):
+        if not self.path or fcntl is None: return True
+        try:
+            self.fh = open(self.path, "a")
+            fcntl.flock(self.fh, fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self.fh: self.fh.close(); self.fh = None
+            return False
+
+    def __exit__(self, *exc):
+        if self.fh:
+            fcntl.flock(self.fh, fcntl.LOCK_UN)
+            self.fh.close()
+            self.fh = None
+        return False
@@ -0,0 +1,159 @@
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ==============================================================================
+# SHEETDB CLIENT
+# One pooled session per process with timeouts and retry/backoff, a circuit
+# breaker so a failing upstream is not hammered, a cap on concurrent upstream
+# calls, an optional rate limit, and request coalescing: concurrent callers
+# asking for the same thing share a single upstream request.
+# ==============================================================================
+class UpstreamError(Exception):
+    pass
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+class CircuitBreaker:
+    # closed -> open after `failure_threshold` consecutive failures; after
+    # `reset_timeout` one trial call is let through (half-open).
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed": return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold: self.opened_at = time.monotonic()
+
+class RateLimiter:
+    # Token bucket: `rate` calls per second on average, bursts of up to `burst`.
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1: return False
+            self.tokens -= 1
+            return True
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SheetDBClient:
+    def __init__(self, url, timeout=(3.05, 15), retries=2, backoff=0.5, pool_size=10, max_concurrency=4,
+                 failure_threshold=5, reset_timeout=30, supports_search=True, queue_timeout=None, rate=None, burst=1):
+        # queue_timeout: seconds to wait for a free concurrency slot (default: the request timeout).
+        # rate/burst: optional cap on upstream calls per second; calls over it are rejected, not queued.
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.supports_search = supports_search
+        self.queue_timeout = queue_timeout if queue_timeout is not None else sum(timeout) if isinstance(timeout, tuple) else timeout
+        self.rate_limiter = RateLimiter(rate, burst) if rate else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stats = {"requests": 0, "coalesced": 0, "errors": 0, "rejected": 0}
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(["GET"]),
+                      respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/json"
+
+    def fetch_all(self):
+        return self._coalesced(self.url)
+
+    def search(self, **filters):
+        # Server-side filtering (SheetDB: GET <api>/search?column=value); falls back to a client-side filter.
+        if not self.supports_search:
+            return [row for row in self.fetch_all() if all(str(row.get(k)) == str(v) for k, v in filters.items())]
+        return self._coalesced(f"{self.url}/search?{urlencode(sorted(filters.items()))}")
+
+    def status(self):
+        return {**self.stats, "circuit": self.breaker.state, "inflight": len(self._inflight)}
+
+    def _coalesced(self, url):
+        with self._lock:
+            call = self._inflight.get(url)
+            leader = call is None
+            if leader: call = self._inflight[url] = _Call()
+            else: self.stats["coalesced"] += 1
+        if leader:
+            try: call.result = self._get(url)
+            except Exception as e: call.error = e
+            finally:
+                with self._lock: del self._inflight[url]
+                call.done.set()
+        else:
+            call.done.wait()
+        if call.error is not None: raise call.error
+        return call.result
+
+    def _get(self, url):
+        if self.rate_limiter is not None and not self.rate_limiter.allow():
+            self.stats["rejected"] += 1
+            raise UpstreamError("SheetDB rate limit reached")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.stats["rejected"] += 1
+            raise UpstreamError("Too many concurrent SheetDB requests")
+        try:
+            if not self.breaker.allow():
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(f"SheetDB circuit open after {self.breaker.failures} consecutive failures")
+            self.stats["requests"] += 1
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+            except (requests.RequestException, ValueError) as e:
+                self.stats["errors"] += 1
+                self.breaker.record_failure()
+                raise UpstreamError(f"SheetDB request failed: {e}") from e
+            self.breaker.record_success()
+            return data
+        finally:
+            self._slots.release()
@@ -0,0 +1,97 @@
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from analytics import PERCENTILES, ScoreAnalytics
+from response_index import SCORE_FIELDS, ResponseIndex
+
+NUM_ROLES = 6
+ROLE_NAMES = [f"role{k}" for k in range(NUM_ROLES)]
+
+def random_row(rng, n_users=30):
+    values = {"Freedom": rng.randint(0, 20), "Security": rng.randint(0, 20), "Responsibility": rng.randint(0, 20),
+              "k_band": rng.randrange(NUM_ROLES)}
+    if rng.random() < 0.1: values[rng.choice(list(values))] = rng.choice(["x", "-1", "2.5", "", "99999"])
+    return {"user_id": f"u{rng.randrange(n_users)}", **{k: str(v) for k, v in values.items()}}
+
+def brute_force(index):
+    # Latest valid scores of every indexed user, read back through get()
+    scores = []
+    for user_id in index.user_ids:
+        try: latest = index.get(user_id)
+        except ValueError: continue
+        scores.append([getattr(latest, field) for field in SCORE_FIELDS])
+    return np.array(scores, dtype=np.int64).reshape(-1, len(SCORE_FIELDS))
+
+def assert_matches(analytics, index):
+    expected = brute_force(index)
+    assert analytics.users == len(expected)
+    for col, field in enumerate(SCORE_FIELDS):
+        counts = np.bincount(expected[:, col], minlength=len(analytics.histograms[field]))
+        assert (analytics.histograms[field] >= 0).all()
+        assert analytics.histograms[field].tolist() == counts.tolist(), field
+
+    doc = json.loads(analytics.summary(ROLE_NAMES)[0])
+    assert doc["users"] == len(expected)
+    assert [doc["roles"][name]["users"] for name in ROLE_NAMES] == np.bincount(expected[:, 3], minlength=NUM_ROLES).tolist()
+    for col, field in enumerate(SCORE_FIELDS[:3]):
+        values = np.sort(expected[:, col])
+        stats = doc["scores"][field]
+        if not len(values):
+            assert stats["mean"] is None
+            continue
+        assert stats["mean"] == round(float(values.mean()), 3)
+        for q in PERCENTILES:
+            # smallest score with at least q% of users at or below it
+            assert stats["percentiles"][f"p{q}"] == values[max(math.ceil(q / 100 * len(values)), 1) - 1]
+        for value in {int(values[0]), int(values[-1]), 10}:
+            below, equal = (values < value).sum(), (values == value).sum()
+            assert analytics.percentile_ranks({field: value})[field] == round(100.0 * (below + 0.5 * equal) / len(values), 1)
+
+@pytest.fixture
+def tracked():
+    index = ResponseIndex(num_roles=NUM_ROLES)
+    analytics = ScoreAnalytics(SCORE_FIELDS, num_roles=NUM_ROLES)
+    index.listeners.append(analytics)
+    return index, analytics
+
+def test_replaced_and_invalidated_rows(tracked):
+    index, analytics = tracked
+    row = lambda user_id, freedom: {"user_id": user_id, "Freedom": str(freedom), "Security": "1", "Responsibility": "2", "k_band": "3"}
+    rows = [row("a", 5), row("b", 5)]
+    index.update(rows)
+    rows = rows + [row("a", 7)]
+    index.update(rows)
+    assert analytics.histograms["freedom"][5] == 1 and analytics.histograms["freedom"][7] == 1
+    rows = rows + [row("b", "bad")]
+    index.update(rows)
+    assert analytics.users == 1
+    assert analytics.percentile_ranks({"freedom": 7})["freedom"] == 50.0
+    assert_matches(analytics, index)
+
+def test_empty_cohort(tracked):
+    index, analytics = tracked
+    doc = json.loads(analytics.summary(ROLE_NAMES)[0])
+    assert doc["users"] == 0 and doc["roles"]["role0"]["share"] is None
+    assert analytics.percentile_ranks({"freedom": 3}) == {"freedom": None}
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_counts_match_brute_force(tracked, seed):
+    index, analytics = tracked
+    rng = random.Random(seed)
+    rows = []
+    for step in range(150):
+        op = rng.choice(["append", "append", "edit", "remove", "patch", "rebuild"])
+        if op == "append" or not rows:
+            rows = rows + [random_row(rng) for _ in range(rng.randint(1, 5))]
+        elif op == "edit":
+            rows = list(rows); rows[rng.randrange(len(rows))] = random_row(rng)
+        elif op == "remove":
+            rows = list(rows); del rows[rng.randrange(len(rows))]
+        elif op == "patch":
+            index.patch([random_row(rng) for _ in range(rng.randint(1, 3))])
+        index.update(rows, rebuild=op == "rebuild")
+        assert_matches(analytics, index)
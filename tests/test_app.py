@@ -0,0 +1,100 @@
+import gzip
+import importlib
+import os
+
+import pytest
+
+import http_cache
+from mock_sheetdb import MockSheetDB
+
+TOKEN = "test-token"
+
+def row(user_id, freedom=10, security=11, responsibility=12, k_band=3):
+    return {"user_id": user_id, "Freedom": str(freedom), "Security": str(security),
+            "Responsibility": str(responsibility), "k_band": str(k_band)}
+
+@pytest.fixture(scope="module")
+def sheet():
+    with MockSheetDB([row("ann")]) as server:
+        yield server
+
+@pytest.fixture(scope="module")
+def app_module(sheet, tmp_path_factory):
+    # app reads its configuration from the environment at import time
+    os.environ.update(SHEETDB_URL=sheet.url, SHEET_SNAPSHOT_PATH=str(tmp_path_factory.mktemp("snapshot") / "sheet.json"),
+                      SHEET_CACHE_TTL="86400", SHEET_SEARCH_ON_MISS="0", CACHE_INVALIDATE_TOKEN=TOKEN)
+    return importlib.import_module("app")
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+@pytest.fixture
+def load_sheet(sheet, client):
+    def load(rows):
+        sheet.set_rows(rows)
+        response = client.post("/cache/invalidate", headers={"X-Invalidate-Token": TOKEN})
+        assert response.status_code == 200
+    return load
+
+def test_user_id_with_slash(client, load_sheet):
+    load_sheet([row("class7/ann", k_band=2)])
+    assert client.get("/?user_id=class7%2Fann").status_code == 200
+    response = client.get("/api/user/class7%2Fann")
+    assert response.status_code == 200
+    assert response.get_json()["user_id"] == "class7/ann"
+    assert response.get_json()["k_band"] == 2
+
+def test_unknown_user_is_a_json_404(client, load_sheet):
+    load_sheet([row("ann")])
+    response = client.get("/api/user/nobody/else")
+    assert response.status_code == 404
+    assert "nobody/else" in response.get_json()["error"]
+
+def test_matching_etag_is_not_modified_without_rendering(client, load_sheet, app_module, monkeypatch):
+    load_sheet([row("ann")])
+    first = client.get("/?user_id=ann")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    def no_render(*args): raise AssertionError("rendered for a matching ETag")
+    monkeypatch.setattr(app_module.page_cache, "get_or_build", no_render)
+    for validator in (etag, etag[2:]):  # weak comparison also accepts the strong form
+        response = client.get("/?user_id=ann", headers={"If-None-Match": validator})
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+def test_if_modified_since(client, load_sheet):
+    load_sheet([row("ann")])
+    last_modified = client.get("/?user_id=ann").headers["Last-Modified"]
+    assert client.get("/?user_id=ann", headers={"If-Modified-Since": last_modified}).status_code == 304
+    # If-None-Match takes precedence: a stale ETag means a full response whatever the date says
+    response = client.get("/?user_id=ann", headers={"If-None-Match": 'W/"stale"', "If-Modified-Since": last_modified})
+    assert response.status_code == 200
+
+def test_changed_row_gets_a_new_etag(client, load_sheet):
+    load_sheet([row("ann", freedom=10)])
+    etag = client.get("/?user_id=ann").headers["ETag"]
+    api_etag = client.get("/api/user/ann").headers["ETag"]
+    load_sheet([row("ann", freedom=10), row("ann", freedom=15)])
+    response = client.get("/?user_id=ann", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = client.get("/api/user/ann", headers={"If-None-Match": api_etag})
+    assert response.status_code == 200
+    assert response.get_json()["scores"]["freedom"] == 15
+
+@pytest.mark.parametrize("accept, expected", [("gzip", "gzip"), ("br, gzip", "br"), ("br", "br"), ("identity", None), (None, None)])
+def test_content_encoding_follows_accept_encoding(client, load_sheet, accept, expected):
+    if expected == "br" and http_cache.brotli is None: expected = "gzip" if "gzip" in accept else None
+    load_sheet([row("ann")])
+    plain = client.get("/?user_id=ann", headers={"Accept-Encoding": "identity"}).data
+    response = client.get("/?user_id=ann", headers={"Accept-Encoding": accept} if accept else {})
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding") == expected
+    assert "Accept-Encoding" in response.headers["Vary"]
+    if expected == "gzip": assert gzip.decompress(response.data) == plain
+    elif expected == "br": assert http_cache.brotli.decompress(response.data) == plain
+    else: assert response.data == plain
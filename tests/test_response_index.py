@@ -0,0 +1,63 @@
+import pytest
+
+from response_index import ResponseIndex
+
+def row(user_id, freedom=1, security=2, responsibility=3, k_band=0):
+    # Shaped like SheetDB rows: capitalised headers, string values
+    return {"user_id": user_id, "Freedom": str(freedom), "Security": str(security),
+            "Responsibility": str(responsibility), "k_band": str(k_band)}
+
+@pytest.fixture
+def index():
+    return ResponseIndex(num_roles=6)
+
+def test_latest_row_wins(index):
+    index.update([row("a", freedom=1), row("b"), row("a", freedom=7, k_band=4)])
+    latest = index.get("a")
+    assert (latest.freedom, latest.k_band) == (7, 4)
+    assert len(index) == 2
+    assert index.get("missing") is None
+
+def test_appended_rows_are_patched(index):
+    rows = [row("a"), row("b")]
+    index.update(rows)
+    updated_at = index.get("a").updated_at
+    index.update(rows + [row("c", freedom=5), row("a", freedom=9)])
+    assert index.get("c").freedom == 5
+    assert index.get("a").freedom == 9
+    assert index.get("b").updated_at == updated_at
+    assert index.rows_indexed == 4
+
+def test_row_changed_in_place_rebuilds(index):
+    index.update([row("a"), row("b", freedom=1), row("c")])
+    index.update([row("a"), row("b", freedom=9), row("c"), row("d")])
+    assert index.get("b").freedom == 9
+    assert index.get("d") is not None
+
+def test_rows_removed_from_the_sheet_rebuild(index):
+    index.update([row("a"), row("b")])
+    index.update([row("b")])
+    assert index.get("a") is None
+    assert len(index) == 1
+
+@pytest.mark.parametrize("field, value", [("Freedom", "12.9"), ("k_band", "2.7"), ("Security", "abc"),
+                                          ("Responsibility", "-1"), ("k_band", "6"), ("Freedom", "")])
+def test_invalid_values_are_reported_by_get(index, field, value):
+    bad = row("a"); bad[field] = value
+    index.update([bad, row("b")])
+    with pytest.raises(ValueError, match="invalid"):
+        index.get("a")
+    assert index.get("b") is not None
+    assert index.stats()["invalid_users"] == 1
+
+def test_missing_score_column_is_reported(index):
+    index.update([{"user_id": "a", "Freedom": "1", "Security": "2", "Responsibility": "3"}])
+    with pytest.raises(ValueError, match="missing k_band column"):
+        index.get("a")
+
+def test_valid_row_replaces_invalid_one(index):
+    bad = row("a", freedom="x")
+    index.update([bad])
+    index.update([bad, row("a", freedom=4)])
+    assert index.get("a").freedom == 4
+    assert index.stats()["invalid_users"] == 0
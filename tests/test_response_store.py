@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from response_store import ResponseStore
+
+class FakeFetch:
+    # Returns a new list of rows per call; can be slowed down or made to fail
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.error = None
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.delay: time.sleep(self.delay)
+        if self.error: raise self.error
+        return [{"user_id": "a", "call": self.calls}]
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline: raise AssertionError("timed out")
+        time.sleep(0.01)
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "snapshot" / "sheet.json")
+
+def test_first_get_fetches(snapshot_path):
+    fetch = FakeFetch()
+    store = ResponseStore(fetch, ttl=60, snapshot_path=snapshot_path)
+    assert store.get() == [{"user_id": "a", "call": 1}]
+    assert store.get() == [{"user_id": "a", "call": 1}]
+    assert fetch.calls == 1
+
+def test_stale_get_returns_while_slow_refresh_runs(snapshot_path):
+    fetch = FakeFetch()
+    store = ResponseStore(fetch, ttl=0.05, snapshot_path=snapshot_path)
+    first = store.get()
+    time.sleep(0.06)
+    fetch.delay = 0.5
+    started = time.monotonic()
+    assert store.get() is first          # starts the background refresh
+    assert store.get() is first          # must not wait for it
+    assert store.status()["refreshing"]
+    assert time.monotonic() - started < 0.2
+    wait_until(lambda: not store.status()["refreshing"])
+    assert store.get() == [{"user_id": "a", "call": 2}]
+    assert fetch.calls == 2
+
+def test_failed_refresh_keeps_rows_and_backs_off(snapshot_path):
+    fetch = FakeFetch()
+    store = ResponseStore(fetch, ttl=0.05, snapshot_path=snapshot_path, error_backoff=0.3)
+    first = store.get()
+    time.sleep(0.06)
+    fetch.error = RuntimeError("upstream down")
+    assert store.get() is first
+    wait_until(lambda: not store.status()["refreshing"])
+    assert store.status()["last_error"] == "upstream down"
+    for _ in range(5): assert store.get() is first
+    assert fetch.calls == 2              # no new attempt within error_backoff
+    time.sleep(0.3)
+    fetch.error = None
+    store.get()
+    wait_until(lambda: fetch.calls == 3 and not store.status()["refreshing"])
+    assert store.get() == [{"user_id": "a", "call": 3}]
+    assert store.status()["last_error"] is None
+
+def test_snapshot_is_shared_between_stores(snapshot_path):
+    writer = ResponseStore(FakeFetch(), ttl=60, snapshot_path=snapshot_path)
+    rows = writer.get()
+    reader_fetch = FakeFetch()
+    reader = ResponseStore(reader_fetch, ttl=60, snapshot_path=snapshot_path)
+    assert reader.get() == rows
+    assert reader_fetch.calls == 0
+
+def test_invalidate_refetches(snapshot_path):
+    fetch = FakeFetch()
+    store = ResponseStore(fetch, ttl=60, snapshot_path=snapshot_path)
+    store.get()
+    assert store.invalidate() == [{"user_id": "a", "call": 2}]
+
+def test_invalidate_raises_when_forced_fetch_fails(snapshot_path):
+    fetch = FakeFetch()
+    store = ResponseStore(fetch, ttl=60, snapshot_path=snapshot_path)
+    first = store.get()
+    fetch.error = RuntimeError("upstream down")
+    with pytest.raises(RuntimeError, match="upstream down"):
+        store.invalidate()
+    assert store.get() is first
+
+def test_stale_get_does_not_wait_for_invalidate(snapshot_path):
+    fetch = FakeFetch()
+    store = ResponseStore(fetch, ttl=0.05, snapshot_path=snapshot_path)
+    first = store.get()
+    time.sleep(0.06)
+    fetch.delay = 0.5
+    invalidating = threading.Thread(target=store.invalidate)
+    invalidating.start()
+    wait_until(lambda: fetch.calls == 2)
+    started = time.monotonic()
+    assert store.get() is first
+    assert time.monotonic() - started < 0.2
+    invalidating.join()
+    assert fetch.calls == 2              # the background refresh stood aside
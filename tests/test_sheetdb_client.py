@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from mock_sheetdb import MockSheetDB, synthetic_rows
+from sheetdb_client import CircuitOpenError, SheetDBClient, UpstreamError
+
+ROWS = synthetic_rows(50, n_users=20)
+
+@pytest.fixture
+def mock():
+    with MockSheetDB(ROWS) as server:
+        yield server
+
+def client_for(mock, **options):
+    options.setdefault("timeout", (1, 1))
+    options.setdefault("backoff", 0)
+    return SheetDBClient(mock.url, **options)
+
+def test_fetch_all(mock):
+    client = client_for(mock)
+    assert client.fetch_all() == ROWS
+    assert client.status()["requests"] == 1
+
+def test_slow_upstream_times_out_after_retries(mock):
+    mock.delay = 0.5
+    client = client_for(mock, timeout=(1, 0.1), retries=2)
+    started = time.monotonic()
+    with pytest.raises(UpstreamError):
+        client.fetch_all()
+    assert time.monotonic() - started < 1.5
+    assert mock.requests_served == 3  # first attempt plus two retries
+    assert client.status()["errors"] == 1
+
+def test_failing_upstream_is_retried(mock):
+    mock.fail_rate = 1
+    client = client_for(mock, retries=2)
+    with pytest.raises(UpstreamError, match="503"):
+        client.fetch_all()
+    assert mock.requests_served == 3
+
+def test_breaker_opens_then_recovers_half_open(mock):
+    mock.fail_rate = 1
+    client = client_for(mock, retries=0, failure_threshold=2, reset_timeout=0.2)
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            client.fetch_all()
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.fetch_all()
+    assert mock.requests_served == 2  # rejected without calling the upstream
+
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+    mock.fail_rate = 0
+    assert client.fetch_all() == ROWS
+    assert client.breaker.state == "closed"
+
+def test_failed_half_open_trial_reopens(mock):
+    mock.fail_rate = 1
+    client = client_for(mock, retries=0, failure_threshold=1, reset_timeout=0.2)
+    with pytest.raises(UpstreamError):
+        client.fetch_all()
+    time.sleep(0.25)
+    with pytest.raises(UpstreamError):
+        client.fetch_all()
+    assert client.breaker.state == "open"
+
+def test_concurrent_fetches_are_coalesced(mock):
+    mock.delay = 0.3
+    client = client_for(mock)
+    n = 8
+    start = threading.Barrier(n)
+    results = [None] * n
+
+    def fetch(i):
+        start.wait()
+        results[i] = client.fetch_all()
+
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(n)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert results == [ROWS] * n
+    assert mock.requests_served == 1
+    assert client.status()["coalesced"] == n - 1
+
+def test_search(mock):
+    user_id = ROWS[0]["user_id"]
+    expected = [row for row in ROWS if row["user_id"] == user_id]
+    assert client_for(mock).search(user_id=user_id) == expected
+    assert client_for(mock).search(user_id="nobody") == []
+    assert client_for(mock, supports_search=False).search(user_id=user_id) == expected
+
+def test_rate_limit_rejects_without_calling_upstream(mock):
+    client = client_for(mock, rate=0.01, burst=2)
+    client.search(user_id="a")
+    client.search(user_id="b")
+    with pytest.raises(UpstreamError, match="rate limit"):
+        client.search(user_id="c")
+    assert mock.requests_served == 2
+    assert client.breaker.state == "closed"